@@ -1,6 +1,8 @@
+# Run from the repo root with: python -m standalone.pinecone_rag
 # Import the Pinecone library
 from pinecone import Pinecone
 from dotenv import load_dotenv
+from utils.search_cache import SearchCache
 import os
 
 load_dotenv()
@@ -79,12 +81,20 @@ records = [
 # Target the index
 dense_index = pc.Index(index_name)
 
-# Upsert the records into a namespace
-dense_index.upsert_records("example-namespace", records)
+# Wrap the index so repeated queries skip embedding and reranking
+# passing similarity_threshold (e.g. 0.95) also reuses results for near-duplicate queries,
+# but then every miss against a warm cache is slower: it costs an extra embed round trip
+# plus a similarity scan over the cached queries before the real search
+# results aren't cached for indexing_wait seconds after an upsert, while the new records are indexed
+indexing_wait = 10
+search_cache = SearchCache(dense_index, inference=pc.inference, max_entries=128, upsert_grace_period=indexing_wait)
+
+# Upsert the records into a namespace (this also clears cached results for it)
+search_cache.upsert_records("example-namespace", records)
 
 # Wait for the upserted vectors to be indexed
 import time
-time.sleep(10)
+time.sleep(indexing_wait)
 
 # View stats for the index
 stats = dense_index.describe_index_stats()
@@ -94,39 +104,27 @@ print(stats)
 query = "Famous historical structures and monuments"
 
 # Search the dense index
-results = dense_index.search(
-    namespace="example-namespace",
-    query={
-        "top_k": 10,
-        "inputs": {
-            'text': query
-        }
-    }
-)
+results = search_cache.search("example-namespace", query, top_k=10)
 
 # Print the results
 for hit in results['result']['hits']:
         print(f"id: {hit['_id']:<5} | score: {round(hit['_score'], 2):<5} | category: {hit['fields']['category']:<10} | text: {hit['fields']['chunk_text']:<50}")
 
 # Search the dense index and rerank results
-reranked_results = dense_index.search(
-    namespace="example-namespace",
-    query={
-        "top_k": 10,
-        "inputs": {
-            'text': query
-        }
-    },
-    rerank={
-        "model": "bge-reranker-v2-m3",
-        "top_n": 10,
-        "rank_fields": ["chunk_text"]
-    }   
-)
+rerank = {
+    "model": "bge-reranker-v2-m3",
+    "top_n": 10,
+    "rank_fields": ["chunk_text"]
+}
+reranked_results = search_cache.search("example-namespace", query, top_k=10, rerank=rerank)
 
 # Print the reranked results
 for hit in reranked_results['result']['hits']:
     print(f"id: {hit['_id']}, score: {round(hit['_score'], 2)}, text: {hit['fields']['chunk_text']}, category: {hit['fields']['category']}")
 
+# Repeating the query (even with different casing/spacing) is served from the cache
+search_cache.search("example-namespace", "  famous historical structures and MONUMENTS ", top_k=10, rerank=rerank)
+print(f"cache hits: {search_cache.hits}, misses: {search_cache.misses}")
+
 # Delete the index
 pc.delete_index(index_name)
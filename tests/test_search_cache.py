@@ -0,0 +1,136 @@
+import math
+
+import pytest
+from pinecone.core.openapi.db_data.models import Hit, SearchRecordsResponse, SearchRecordsResponseResult, SearchUsage
+from pinecone.core.openapi.inference.models import DenseEmbedding, EmbeddingsList as OpenAPIEmbeddingsList, EmbeddingsListUsage
+from pinecone.inference.models import EmbeddingsList
+
+from utils.search_cache import SearchCache
+
+RERANK = {"model": "bge-reranker-v2-m3", "top_n": 10, "rank_fields": ["chunk_text"]}
+
+
+class StubIndex:
+    """Returns the same SearchRecordsResponse models as dense_index.search."""
+
+    def __init__(self):
+        self.searches = 0
+
+    def search(self, namespace, query, rerank=None):
+        self.searches += 1
+        hit = Hit(_id=f"{namespace}-{self.searches}", _score=0.5, fields={"chunk_text": query["inputs"]["text"]})
+        return SearchRecordsResponse(
+            result=SearchRecordsResponseResult(hits=[hit]),
+            usage=SearchUsage(read_units=1)
+        )
+
+    def upsert_records(self, namespace, records):
+        pass
+
+
+class StubInference:
+    """Returns the same EmbeddingsList as pc.inference.embed.
+
+    Queries sharing a first word embed to the same direction.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, model, inputs, parameters):
+        self.calls += 1
+        angles = [sum(map(ord, text.split()[0])) for text in inputs]
+        data = [DenseEmbedding(values=[math.cos(angle), math.sin(angle)], vector_type="dense") for angle in angles]
+        return EmbeddingsList(OpenAPIEmbeddingsList(model=model, vector_type="dense", data=data, usage=EmbeddingsListUsage(total_tokens=1)))
+
+
+@pytest.fixture
+def index():
+    return StubIndex()
+
+
+def test_normalized_query_hits_cache(index):
+    cache = SearchCache(index)
+    first = cache.search("ns", "Famous  Monuments")
+    second = cache.search("ns", "famous monuments ")
+
+    assert index.searches == 1
+    assert cache.hits == 1 and cache.misses == 1
+    assert second["result"]["hits"][0]["_id"] == first["result"]["hits"][0]["_id"] == "ns-1"
+    assert second["result"]["hits"][0]["fields"]["chunk_text"] == "Famous  Monuments"
+
+
+def test_returned_results_are_copies(index):
+    cache = SearchCache(index)
+    cache.search("ns", "famous monuments")["result"]["hits"].clear()
+    cache.search("ns", "famous monuments")["result"]["hits"][0]["fields"].clear()
+
+    assert cache.search("ns", "famous monuments")["result"]["hits"][0]["fields"]
+
+
+def test_rerank_and_top_k_are_part_of_key(index):
+    cache = SearchCache(index)
+    cache.search("ns", "famous monuments")
+    cache.search("ns", "famous monuments", rerank=RERANK)
+    cache.search("ns", "famous monuments", top_k=5)
+    cache.search("ns", "famous monuments", rerank=dict(reversed(list(RERANK.items()))))
+
+    assert index.searches == 3
+
+
+def test_lru_eviction(index):
+    cache = SearchCache(index, max_entries=2)
+    cache.search("ns", "a")
+    cache.search("ns", "b")
+    cache.search("ns", "a")
+    cache.search("ns", "c")  # evicts "b", the least recently used
+
+    assert list(cache.results) == [("ns", "a", 10, None), ("ns", "c", 10, None)]
+
+
+def test_upsert_invalidates_namespace_and_waits_out_grace_period(index):
+    cache = SearchCache(index, upsert_grace_period=60)
+    cache.search("ns", "a")
+    cache.search("other", "a")
+    cache.upsert_records("ns", [])
+    assert list(cache.results) == [("other", "a", 10, None)]
+
+    cache.search("ns", "a")
+    assert ("ns", "a", 10, None) not in cache.results
+
+    cache.upserted_at["ns"] -= 60
+    cache.search("ns", "a")
+    assert ("ns", "a", 10, None) in cache.results
+
+
+def test_similarity_threshold_requires_inference(index):
+    with pytest.raises(ValueError):
+        SearchCache(index, similarity_threshold=0.95)
+
+
+def test_near_duplicate_queries_hit_cache(index):
+    inference = StubInference()
+    cache = SearchCache(index, inference=inference, similarity_threshold=0.999)
+    cache.search("ns", "monuments famous")
+    assert inference.calls == 0  # cold cache: nothing to compare against
+
+    cache.search("ns", "monuments historical")
+    assert index.searches == 1 and cache.hits == 1 and inference.calls == 1
+
+    # near-duplicates only match within the same namespace and rerank config
+    cache.search("other", "monuments historical")
+    cache.search("ns", "monuments historical", rerank=RERANK)
+    assert index.searches == 3
+
+
+def test_miss_makes_at_most_one_embed_call(index):
+    inference = StubInference()
+    cache = SearchCache(index, inference=inference, max_entries=4, similarity_threshold=0.999)
+    for query in ["monuments famous", "x", "y", "z"]:
+        cache.search("ns", query)
+    for _ in range(4):
+        cache.search("ns", "monuments again")
+
+    calls = inference.calls
+    cache.search("ns", "fresh query")
+    assert inference.calls == calls + 1
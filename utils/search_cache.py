@@ -0,0 +1,132 @@
+import copy
+import json
+import math
+import time
+from collections import OrderedDict
+
+
+class SearchCache:
+    """LRU cache for dense_index.search results, keyed per namespace.
+
+    Repeated (or, with similarity_threshold set, near-duplicate) queries are
+    served locally so they skip the embedding, retrieval and rerank round trips.
+
+    Upserting through the cache clears every cached entry for that namespace and,
+    because pinecone indexes records asynchronously, stops caching results for that
+    namespace for upsert_grace_period seconds so pre-upsert results aren't kept.
+    Writes made directly through the index (upsert, delete, upsert_records) skip
+    invalidation - call invalidate(namespace) yourself after those.
+    """
+
+    def __init__(self, index, inference=None, max_entries=128, similarity_threshold=None,
+                 embed_model="llama-text-embed-v2", upsert_grace_period=10.0):
+        self.index = index
+        # pc.inference - only needed when near-duplicate matching is on
+        self.inference = inference
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embed_model = embed_model
+        self.upsert_grace_period = upsert_grace_period
+        if similarity_threshold is not None and inference is None:
+            raise ValueError("inference client is required when similarity_threshold is set")
+        # (namespace, query, top_k, rerank) -> (query embedding or None, search response as plain dicts)
+        # the embedding lives with its result so both are evicted together, and is
+        # only filled in once there is another query to compare it against
+        self.results = OrderedDict()
+        self.upserted_at = {}  # namespace -> time.monotonic() of the last upsert
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query):
+        # lowercase and collapse whitespace so trivial rewordings share a key
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _similarity(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    def _embed(self, queries):
+        # one batched round trip however many queries need embedding
+        embeddings = self.inference.embed(
+            model=self.embed_model,
+            inputs=queries,
+            parameters={"input_type": "query"}
+        )
+        return [embedding.values for embedding in embeddings]
+
+    def _candidates(self, key):
+        # cached entries that could stand in for key: same namespace, top_k and rerank
+        namespace, _, top_k, rerank = key
+        return [cached_key for cached_key in self.results
+                if cached_key[0] == namespace and cached_key[2:] == (top_k, rerank)]
+
+    def _find_similar(self, query, candidates):
+        # entries are cached unembedded, so embed the query together with any
+        # candidates that don't have an embedding yet and store them on the entry
+        missing = [cached_key for cached_key in candidates if self.results[cached_key][0] is None]
+        embedding, *embeddings = self._embed([query] + [cached_key[1] for cached_key in missing])
+        for cached_key, cached_embedding in zip(missing, embeddings):
+            self.results[cached_key] = (cached_embedding, self.results[cached_key][1])
+
+        best_key, best_score = None, self.similarity_threshold
+        for cached_key in candidates:
+            score = self._similarity(embedding, self.results[cached_key][0])
+            if score >= best_score:
+                best_key, best_score = cached_key, score
+        return embedding, best_key
+
+    def _recently_upserted(self, namespace):
+        upserted_at = self.upserted_at.get(namespace)
+        return upserted_at is not None and time.monotonic() - upserted_at < self.upsert_grace_period
+
+    def search(self, namespace, query, top_k=10, rerank=None):
+        """Search through the cache. Returns a copy, so callers may modify the result.
+
+        Results are plain dicts (response.to_dict()) rather than SDK response objects,
+        since those can't be deep-copied; hit['_id'] / hit['fields'] access still works.
+        """
+        # rerank config is a dict, so serialise it to make it hashable
+        rerank_key = json.dumps(rerank, sort_keys=True) if rerank else None
+        key = (namespace, self.normalize(query), top_k, rerank_key)
+        embedding = None
+
+        if key not in self.results and self.similarity_threshold is not None:
+            candidates = self._candidates(key)
+            # a cold cache has nothing to match against, so don't pay for an embed call
+            if candidates:
+                embedding, similar_key = self._find_similar(key[1], candidates)
+                key = similar_key or key
+
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return copy.deepcopy(self.results[key][1])
+
+        self.misses += 1
+        kwargs = {"namespace": namespace, "query": {"top_k": top_k, "inputs": {'text': query}}}
+        if rerank:
+            kwargs["rerank"] = rerank
+        # convert once to plain data - pinecone's response models break copy.deepcopy
+        results = self.index.search(**kwargs)
+        if hasattr(results, "to_dict"):
+            results = results.to_dict()
+
+        if not self._recently_upserted(namespace):
+            self.results[key] = (embedding, results)
+            while len(self.results) > self.max_entries:
+                self.results.popitem(last=False)
+        return copy.deepcopy(results)
+
+    def invalidate(self, namespace):
+        for key in [key for key in self.results if key[0] == namespace]:
+            del self.results[key]
+
+    def upsert_records(self, namespace, records):
+        response = self.index.upsert_records(namespace, records)
+        self.invalidate(namespace)
+        self.upserted_at[namespace] = time.monotonic()
+        return response
+